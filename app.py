@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import plotly.express as px
 import plotly.graph_objects as go
-from PIL import Image
+import plotly.io as pio
+from tsdownsample import LTTBDownsampler
 import os
+import csv
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -12,39 +22,277 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Shared figure layout: horizontal legend above the plot and time on the x axis.
+# Layered on Streamlit's own plotly template so the app theme still applies.
+LEGEND = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+pio.templates["mppt"] = go.layout.Template(layout=go.Layout(legend=LEGEND, xaxis_title="Time (h)"))
+pio.templates.default = "streamlit+mppt"
+
+# Above this many points, scatter plots switch from SVG to WebGL (Scattergl).
+# Kept to the MPPT scatter plots only: browsers cap live WebGL contexts per page.
+SCATTERGL_MIN_ROWS = 1000
+
+# Quantile bins for the MPPT scatter colours (one uniformly coloured trace each)
+COLOR_BINS = 16
+
+# Points kept per line trace; a ~1600 px wide chart cannot resolve more
+LINE_POINTS = 2000
+
+# Known Simulink / NREL schema. Declaring the types up front lets Arrow convert
+# each column directly instead of running a type-inference pass first.
+# Time parses as float64 so the seconds-to-hours division runs on exact values;
+# the resulting hours are then stored as float32 like every other column.
+CSV_DTYPES = {
+    "time": pa.float64(),
+    "Time_Seconds": pa.float64(),
+    **{col: pa.float32() for col in (
+        "Pl/t", "Ppv/t", "Pload", "Ppv", "Vload:1", "Vpv", "Iload", "Ipv",
+        "Temperature", "GHI", "DNI", "DHI", "Solar_Zenith_Angle",
+    )},
+}
+
+# Normalize column names    
+# ['time', 'Pl/t', 'Ppv/t', 'Pload', 'Ppv', 'Vload:1', 'Vpv', 'Iload', 'Ipv']
+RENAME_MAP = {
+    "time": "Time",
+    "Time_Seconds": "Time",  # Handle input data format
+    "Pl/t": "Energy_Load",   
+    "Ppv/t": "Energy_PV",    
+    "Vload:1": "Vload"       
+}
+
 # --- HELPER FUNCTIONS ---
-@st.cache_data
-def load_data(file_path):
+def is_fresh(path, source_path):
     """
-    Loads CSV data and normalizes column names based on your Simulink output.
+    True if `path` exists and is at least as new as `source_path`.
     """
-    if not os.path.exists(file_path):
-        return pd.DataFrame()
-    
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source_path)
+
+
+def summarize(table):
+    """
+    Returns the scalar facts the metrics row needs from a raw (un-renamed) table.
+    """
+    summary = {"n_rows": table.num_rows}
+    if "Pl/t" in table.column_names:
+        # The integrated energy column accumulates over time, so max value = total energy
+        summary["total_energy"] = pc.max(table["Pl/t"]).as_py()
+    return summary
+
+
+def read_summary(file_path):
+    """
+    Returns a file's summary from the small .meta.json written next to it,
+    recomputing (and rewriting) it if it is missing, unreadable or older than the CSV.
+    """
+    stem = os.path.splitext(file_path)[0]
+    meta_path = stem + ".meta.json"
+    if is_fresh(meta_path, file_path):
+        try:
+            with open(meta_path) as f:
+                summary = json.load(f)
+            if isinstance(summary, dict) and "n_rows" in summary:
+                return summary
+        except (OSError, ValueError):
+            pass  # Unreadable sidecar: treat it as missing
+
+    # A fresh Parquet copy is summarized from just the energy column (the row count
+    # survives the projection); otherwise read_table re-parses the CSV and writes
+    # both the copy and the sidecar itself
+    parquet_path = stem + ".parquet"
+    if is_fresh(parquet_path, file_path):
+        usecols = [c for c in ("Pl/t",) if c in pq.read_schema(parquet_path).names]
+        summary = summarize(read_table(file_path, usecols))
+        try:
+            write_json(meta_path, summary)
+        except OSError:
+            pass  # Read-only data folder
+        return summary
+    return summarize(read_table(file_path))
+
+
+def read_total_energy(file_path):
+    """
+    Returns the total energy recorded in a Simulink output file.
+    """
+    summary = read_summary(file_path)
+    if summary.get("total_energy") is None:
+        raise ValueError(f"{file_path} has no integrated energy column (Pl/t)")
+    return summary["total_energy"]
+
+
+def replace_atomically(path, write):
+    """
+    Calls `write(tmp_path)` on a temp file next to `path`, then swaps it into place,
+    so a concurrent reader sees either the old file or the complete new one.
+    """
+    # A unique name rather than mkstemp, which would create the file as 0600: letting
+    # `write` create it keeps the umask's permissions, so other users can read the copy
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
     try:
-        df = pd.read_csv(file_path)
-
-        # Normalize column names    
-        # ['time', 'Pl/t', 'Ppv/t', 'Pload', 'Ppv', 'Vload:1', 'Vpv', 'Iload', 'Ipv']
-        rename_map = {
-            "time": "Time",
-            "Time_Seconds": "Time",  # Handle input data format
-            "Pl/t": "Energy_Load",   
-            "Ppv/t": "Energy_PV",    
-            "Vload:1": "Vload"       
-        }
-        df.rename(columns=rename_map, inplace=True)
-        
-        # Convert Time to Hours
-        if "Time" in df.columns:
-            df["Time"] = df["Time"] / 3600.0
-            
-        return df
-    except Exception as e:
-        st.error(f"Error loading {file_path}: {e}")
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(path, data):
+    """
+    Atomically writes `data` as JSON to `path`.
+    """
+    def dump(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+    replace_atomically(path, dump)
+
+
+def read_table(file_path, usecols=None):
+    """
+    Reads a CSV as an Arrow table through a Parquet copy written next to it on first use.
+    The copy is rebuilt whenever the CSV is newer and always holds every column
+    under its raw name, so `usecols` is applied when reading it back. A .meta.json
+    summary is written alongside it.
+    """
+    columns = list(usecols) if usecols is not None else None
+    stem = os.path.splitext(file_path)[0]
+    parquet_path = stem + ".parquet"
+    if is_fresh(parquet_path, file_path):
+        return pq.read_table(parquet_path, columns=columns)
+
+    # Arrow's reader parses on multiple threads; columns missing from a file are ignored
+    convert_options = pa_csv.ConvertOptions(column_types=CSV_DTYPES)
+    table = pa_csv.read_csv(file_path, convert_options=convert_options)
+    try:
+        replace_atomically(parquet_path, lambda tmp_path: pq.write_table(table, tmp_path, compression="snappy"))
+        write_json(stem + ".meta.json", summarize(table))
+    except OSError:
+        pass  # Read-only data folder: keep serving from the CSV
+    return table if columns is None else table.select(columns)
+
+
+@st.cache_data(persist="disk", max_entries=8, show_spinner=False)
+def prepare_data(file_path, usecols=None, mtime=None):
+    """
+    Reads one file and normalizes column names based on your Simulink output.
+    Cached on disk across restarts; `mtime` is only part of the cache key so an
+    edited CSV is re-read. Errors propagate so a failed load is never cached.
+    """
+    table = read_table(file_path, usecols)
+    # Renaming the Arrow table is metadata-only, so pandas never rebuilds the columns
+    table = table.rename_columns([RENAME_MAP.get(c, c) for c in table.column_names])
+
+    # Convert Time to Hours on the Arrow side, swapping the seconds column out so
+    # to_pandas() only ever materializes the float32 hours
+    if "Time" in table.column_names:
+        hours = pc.divide(pc.cast(table["Time"], pa.float64()), 3600.0)
+        table = table.set_column(table.column_names.index("Time"), "Time", pc.cast(hours, pa.float32()))
+
+    return table.to_pandas()
+
+
+def read_file(file_path, usecols=None):
+    """
+    Returns the normalized frame for a file, or an empty one if it is missing.
+    Pass `usecols` (raw CSV header names) to load only the columns a plot needs.
+    Load errors are raised to the caller.
+    """
+    if not os.path.exists(file_path):
         return pd.DataFrame()
+    return prepare_data(file_path, usecols, os.path.getmtime(file_path))
+
+
+def read_many(specs):
+    """
+    Reads several (file_path, usecols) pairs at once and returns the frames in order.
+    Arrow parsing releases the GIL, so cold reads overlap on a thread pool.
+    """
+    with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+        return list(executor.map(lambda spec: read_file(*spec), specs))
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def csv_columns(file_path, mtime=None):
+    """
+    Returns the header names of a CSV without parsing any rows.
+    `mtime` is only part of the cache key so a re-exported CSV is re-read.
+    """
+    if not os.path.exists(file_path):
+        return ()
+    with open(file_path, newline="") as f:
+        return tuple(next(csv.reader(f), ()))
+
+
+def as_array(df, col):
+    """
+    Returns a column as a float32 NumPy array so Plotly ships it as a typed array.
+    """
+    return df[col].to_numpy(dtype=np.float32)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def downsample(x, y, n=LINE_POINTS):
+    """
+    Reduces a line to `n` points with Largest-Triangle-Three-Buckets, which
+    keeps peaks and dips visible. `x` must be sorted.
+    """
+    if len(x) <= n:
+        return x, y
+    idx = LTTBDownsampler().downsample(x, y, n_out=n)
+    return x[idx], y[idx]
+
+
+def line_data(df, col):
+    """
+    Returns downsampled x/y arrays of `col` against Time, ready to splat into a trace.
+    """
+    x, y = downsample(as_array(df, "Time"), as_array(df, col))
+    return dict(x=x, y=y)
 
 
+def binned_scatter(df, x, y, color, title, labels, n_bins=COLOR_BINS):
+    """
+    Scatter of `y` against `x` coloured by `color`, split into quantile bins with
+    one uniformly coloured trace per bin. WebGL batches each bin as a single draw
+    instead of running a per-point colormap lookup. `labels` maps column names
+    to axis / colorbar titles.
+    """
+    bins, edges = pd.qcut(df[color], n_bins, labels=False, retbins=True, duplicates="drop")
+    bins = bins.to_numpy()
+    if len(edges) < 2:
+        # Constant colour column: qcut leaves no bins, so plot every point as one bin
+        bins = np.zeros(len(df))
+        edges = np.array([df[color].min(), df[color].max()])
+    xs, ys, cs = as_array(df, x), as_array(df, y), as_array(df, color)
+    trace = go.Scattergl if len(df) > SCATTERGL_MIN_ROWS else go.Scatter
+
+    # Colour each bin by its index, so every quantile gets its own step on the scale
+    k = len(edges) - 1
+    colors = px.colors.sample_colorscale("Viridis", [b / max(k - 1, 1) for b in range(k)])
+    # Each point still hovers with its own value of the colour column
+    hovertemplate = (f"{labels[x]}: %{{x:.2f}}<br>{labels[y]}: %{{y:.2f}}"
+                     f"<br>{labels[color]}: %{{customdata:.0f}}<extra></extra>")
+
+    fig = go.Figure()
+    for b, bin_color in enumerate(colors):
+        in_bin = bins == b
+        fig.add_trace(trace(
+            x=xs[in_bin], y=ys[in_bin], customdata=cs[in_bin], mode="markers",
+            marker=dict(color=bin_color, size=3), hovertemplate=hovertemplate,
+            name=f"{edges[b]:.0f}–{edges[b + 1]:.0f} W", showlegend=False
+        ))
+    # Empty trace that only draws the colorbar: one flat step per bin, ticked at the quantile edges
+    colorscale = [[(b + i) / k, bin_color] for b, bin_color in enumerate(colors) for i in (0, 1)]
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None], mode="markers", hoverinfo="skip", showlegend=False,
+        marker=dict(colorscale=colorscale, cmin=0, cmax=k, color=[0], showscale=True,
+                    colorbar=dict(title=labels[color], tickvals=list(range(k + 1)),
+                                  ticktext=[f"{edge:.0f}" for edge in edges]))
+    ))
+    fig.update_layout(title=title, xaxis_title=labels[x], yaxis_title=labels[y])
+    return fig
+
 
 # Map your files exactly as requested
 file_map = {
@@ -57,11 +305,190 @@ file_map = {
         "Fixed": "./Data/cloudy_1.csv"
     }
 }
+# Raw CSV columns each dataframe actually feeds into the metrics and tabs
+TRACK_COLS = ("time", "Pl/t", "Pload", "Ppv", "Vload:1", "Vpv", "Iload", "Ipv")
+FIXED_COLS = ("time", "Pl/t", "Pload")
+WEATHER_COLS = ("Temperature", "GHI", "DNI", "DHI")
+INPUT_COLS = ("Time_Seconds",) + WEATHER_COLS
+
+TABS = ["Input Data", "Power & Energy", "Converter Losses", "MPPT Diagnostics"]
+
 file_map_input = {
     "Clear Day": "./Data/phoenix_clear_1s.csv",
     "Cloudy Day": "./Data/phoenix_cloudy_1s.csv"
 }
 
+# --- DERIVED DATA (cached per scenario so widget reruns skip the math) ---
+def scenario_mtimes(scenario):
+    """
+    Returns the modification times of a scenario's source files. Passed to the
+    per-scenario caches as part of their key, so an edited CSV is picked up.
+    """
+    paths = (file_map[scenario]["Tracking"], file_map[scenario]["Fixed"], file_map_input[scenario])
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def compute_metrics(scenario, mtimes=None):
+    """
+    Returns (total tracking energy, total fixed energy, gain %) for a scenario.
+    """
+    paths = file_map[scenario]
+    # Totals come from the per-file summaries, so the big arrays are never touched here
+    total_track = read_total_energy(paths["Tracking"])
+    total_fixed = read_total_energy(paths["Fixed"])
+
+    # Calculate Gain
+    if total_fixed > 0:
+        gain = ((total_track - total_fixed) / total_fixed) * 100
+    else:
+        gain = 0
+    return total_track, total_fixed, gain
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def compute_efficiency(scenario, mtimes=None):
+    """
+    Returns (time in hours, efficiency %) arrays for the instantaneous converter efficiency.
+    """
+    df_track = read_file(file_map[scenario]["Tracking"], TRACK_COLS)
+    ppv = as_array(df_track, "Ppv")
+    pload = as_array(df_track, "Pload")
+    # Filter out low power noise (e.g., night time or < 1W) to avoid division by zero spikes
+    mask = ppv > 1.0
+    eff = pload[mask] / ppv[mask] * 100.0
+    return as_array(df_track, "Time")[mask], eff
+
+
+def input_spec(scenario):
+    """
+    Returns the (file_path, usecols) to read the weather data for a scenario from.
+    """
+    track_path = file_map[scenario]["Tracking"]
+    mtime = os.path.getmtime(track_path) if os.path.exists(track_path) else None
+    if set(WEATHER_COLS) <= set(csv_columns(track_path, mtime)):
+        # The Tracking export already carries the weather: no second file to read
+        return track_path, ("time",) + WEATHER_COLS
+    return file_map_input[scenario], INPUT_COLS
+
+
+# --- FIGURE BUILDERS (cached per scenario; only the selected view calls one) ---
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_input_figures(scenario, mtimes=None):
+    """
+    Returns (temperature, irradiance) figures, or () if no weather data is available.
+    """
+    df_input = read_file(*input_spec(scenario))
+    # Check if we have the necessary columns (from Input Data CSVs)
+    if df_input.empty or "Temperature" not in df_input.columns or "GHI" not in df_input.columns:
+        return ()
+
+    # Graph 1: Temperature
+    fig_temp = px.line(**line_data(df_input, "Temperature"), title="Ambient Temperature (°C)", render_mode="svg")
+    fig_temp.update_layout(xaxis_title="Time (h)", yaxis_title="Temperature (°C)")
+
+    # Graph 2: Irradiance
+    fig_irr = go.Figure()
+    fig_irr.add_trace(go.Scatter(**line_data(df_input, "GHI"), name="GHI", line=dict(color="#FFC107")))
+    fig_irr.add_trace(go.Scatter(**line_data(df_input, "DNI"), name="DNI", line=dict(color="#FF5722")))
+    fig_irr.add_trace(go.Scatter(**line_data(df_input, "DHI"), name="DHI", line=dict(color="#03A9F4")))
+    fig_irr.update_layout(title="Solar Irradiance (W/m²)", yaxis_title="Irradiance (W/m²)")
+    return fig_temp, fig_irr
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_power_figures(scenario, mtimes=None):
+    """
+    Returns (instantaneous power, cumulative energy) tracking-vs-fixed figures.
+    """
+    paths = file_map[scenario]
+    df_track, df_fixed = read_many([(paths["Tracking"], TRACK_COLS), (paths["Fixed"], FIXED_COLS)])
+
+    # Graph 1: Instantaneous Power Comparison
+    fig_pwr = go.Figure()
+    fig_pwr.add_trace(go.Scatter(**line_data(df_track, "Pload"), name="Tracking Output", line=dict(color="#00CC96")))
+    fig_pwr.add_trace(go.Scatter(**line_data(df_fixed, "Pload"), name="Fixed Output", line=dict(color="#EF553B", dash='dash')))
+    fig_pwr.update_layout(title="Instantaneous Power Output at Load", yaxis_title="Power (W)")
+
+    # Graph 2: Cumulative Energy
+    fig_cum = go.Figure()
+    fig_cum.add_trace(go.Scatter(**line_data(df_track, "Energy_Load"), name="Tracking Energy", line=dict(color="#00CC96")))
+    fig_cum.add_trace(go.Scatter(**line_data(df_fixed, "Energy_Load"), name="Fixed Energy", line=dict(color="#EF553B")))
+    fig_cum.update_layout(title="Cumulative Energy Harvest", yaxis_title="Energy (Wh)")
+    return fig_pwr, fig_cum
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_loss_figures(scenario, mtimes=None):
+    """
+    Returns (input vs output power, converter efficiency) figures.
+    """
+    df_track = read_file(file_map[scenario]["Tracking"], TRACK_COLS)
+
+    # Graph 3: Source vs Load (Shows Converter Loss)
+    fig_loss = go.Figure()
+    fig_loss.add_trace(go.Scatter(**line_data(df_track, "Ppv"), name="Panel Power (Input)"))
+    fig_loss.add_trace(go.Scatter(**line_data(df_track, "Pload"), name="Load Power (Output)"))
+    fig_loss.update_layout(title="Power Conversion: Input vs Output", yaxis_title="Power (W)")
+
+    # Graph 4: Instantaneous Efficiency
+    time_h, eff = downsample(*compute_efficiency(scenario, mtimes))
+    fig_eff = px.line(x=time_h, y=eff, title="Converter Efficiency (%)", labels={"x": "Time", "y": "Efficiency"}, render_mode="svg")
+    fig_eff.update_yaxes(range=[90, 100]) # Focus on the relevant efficiency range
+    return fig_loss, fig_eff
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_mppt_figures(scenario, mtimes=None):
+    """
+    Returns the panel-side and load-side MPPT operating point scatter figures.
+    """
+    df_track = read_file(file_map[scenario]["Tracking"], TRACK_COLS)
+
+    # Graph 5: IV Curve Scatter
+    # Shows where the MPPT "hunted" for power
+    fig_iv = binned_scatter(
+        df_track, 
+        x="Vpv", 
+        y="Ipv", 
+        color="Ppv", 
+        title="MPPT Trajectory at Pannel (VvsI)",
+        labels={"Vpv": "Panel Voltage (V)", "Ipv": "Panel Current (A)", "Ppv": "Power (W)"}
+    )
+
+    fig_v = binned_scatter(
+        df_track, 
+        x="Vload", 
+        y="Iload", 
+        color="Pload", 
+        title="MPPT Trajectory at Load (VvsI)",
+        labels={"Vload": "Load Voltage (V)", "Iload": "Load Current (A)", "Pload": "Load Power (W)"}
+    )
+    return fig_iv, fig_v
+
+
+def build_or_report(builder, scenario):
+    """
+    Runs a cached per-scenario builder (metrics or figures), reporting load errors
+    instead of raising. Returns None on failure.
+    """
+    try:
+        return builder(scenario, scenario_mtimes(scenario))
+    except Exception as e:
+        st.error(f"Error loading {scenario} data: {e}")
+        return None
+
+
+def keep_tab_selected():
+    """
+    Re-selects the previous view when the user clicks the active one off, so the
+    control and the rendered view always agree.
+    """
+    if st.session_state["active_tab"] is None:
+        previous = st.query_params.get("tab")
+        st.session_state["active_tab"] = previous if previous in TABS else TABS[0]
+
+
 # --- MAIN APP ---
 st.title("Solar Tracker & MPPT Performance Analysis")
 
@@ -77,8 +504,9 @@ with st.expander("Simulink Model", expanded=True):
     # Updated path for the screenshot
     img_path = "./Data/MODEL.png"
     if os.path.exists(img_path):
-        image = Image.open(img_path) 
-        st.image(image, caption="Simulink Model: Tracker Logic & Power Electronics", width="stretch")
+        # MODEL.png is kept at most 1460 px wide (Streamlit's max content width), so
+        # st.image serves the file's bytes as-is instead of resizing and re-encoding them
+        st.image(img_path, caption="Simulink Model: Tracker Logic & Power Electronics", width="stretch")
     else:
         st.warning(f" Image not found at {img_path}. Please check the filename.")
 
@@ -89,29 +517,15 @@ selected_day = st.segmented_control(
     default="Clear Day"
 )
 
-# Load Data based on selection
 paths = file_map[selected_day]
-df_track = load_data(paths["Tracking"])
-df_fixed = load_data(paths["Fixed"])
+files_found = os.path.exists(paths["Tracking"]) and os.path.exists(paths["Fixed"])
 
-# Load separate input data for Tab 0 (Input Data Details)
-# Load separate input data for Tab 0 (Input Data Details)
-df_input = load_data(file_map_input[selected_day])
+# --- METRICS ROW ---
+metrics = build_or_report(compute_metrics, selected_day) if files_found else None
 
 # Only proceed if data loaded successfully
-if not df_track.empty and not df_fixed.empty:
-    
-    # --- METRICS ROW ---
-    # We take the maximum value of the integrated energy column for Total Energy
-    # (Since it accumulates over time, max value = total energy)
-    total_e_track = df_track["Energy_Load"].max()
-    total_e_fixed = df_fixed["Energy_Load"].max()
-    
-    # Calculate Gain
-    if total_e_fixed > 0:
-        gain_pct = ((total_e_track - total_e_fixed) / total_e_fixed) * 100
-    else:
-        gain_pct = 0
+if metrics is not None:
+    total_e_track, total_e_fixed, gain_pct = metrics
     
     # Create 3 columns for metrics
     m1, m2, m3 = st.columns(3)
@@ -121,127 +535,51 @@ if not df_track.empty and not df_fixed.empty:
     
     st.divider()
 
-    # --- TABS FOR ANALYSIS ---
-    tab0, tab1, tab2, tab3 = st.tabs(["Input Data", "Power & Energy", "Converter Losses", "MPPT Diagnostics"])
+    # --- VIEWS FOR ANALYSIS ---
+    # st.tabs would run (and serialize) every tab body on each rerun, so only the
+    # selected view is built. The choice is mirrored in the URL (?tab=...).
+    if "active_tab" not in st.session_state:
+        requested = st.query_params.get("tab")
+        st.session_state["active_tab"] = requested if requested in TABS else TABS[0]
+    active_tab = st.segmented_control("View", TABS, key="active_tab", on_change=keep_tab_selected)
+    st.query_params["tab"] = active_tab
 
     # TAB 0: Input Data Details
-    with tab0:
+    if active_tab == "Input Data":
         st.subheader("Input Weather Data")
-        
-        # Check if we have the necessary columns (from Input Data CSVs)
-        # We'll prioritize the 'Tracking' dataframe as the source for weather data 
-        # (assuming both Tracking/Fixed input files have same weather data)
-        # Check if we have the necessary columns (from Input Data CSVs)
-        # Check if we have the necessary columns (from Input Data CSVs)
-        # We use df_input which is specifically loaded from file_map_input
-        if not df_input.empty and "Temperature" in df_input.columns and "GHI" in df_input.columns:
+        figs = build_or_report(build_input_figures, selected_day)
+        if figs:
             col_temp, col_irr = st.columns(2)
-                
-            with col_temp:
-                # Graph 1: Temperature
-                fig_temp = px.line(df_input, x="Time", y="Temperature", title="Ambient Temperature (°C)")
-                fig_temp.update_layout(xaxis_title="Time (h)", yaxis_title="Temperature (°C)")
-                st.plotly_chart(fig_temp, use_container_width=True)
-                
-            with col_irr:
-                # Graph 2: Irradiance
-                fig_irr = go.Figure()
-                fig_irr.add_trace(go.Scatter(x=df_input["Time"], y=df_input["GHI"], name="GHI", line=dict(color="#FFC107")))
-                fig_irr.add_trace(go.Scatter(x=df_input["Time"], y=df_input["DNI"], name="DNI", line=dict(color="#FF5722")))
-                fig_irr.add_trace(go.Scatter(x=df_input["Time"], y=df_input["DHI"], name="DHI", line=dict(color="#03A9F4")))
-                fig_irr.update_layout(
-                    title="Solar Irradiance (W/m²)", 
-                    xaxis_title="Time (h)", 
-                    yaxis_title="Irradiance (W/m²)",
-                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                )
-                st.plotly_chart(fig_irr, use_container_width=True)
-        else:
+            col_temp.plotly_chart(figs[0], use_container_width=True)
+            col_irr.plotly_chart(figs[1], use_container_width=True)
+        elif figs is not None:
             st.info("Weather data (Temperature, GHI) not available or input data file not found.")
-            
 
     # TAB 1: POWER & ENERGY COMPARISON
-    with tab1:
+    elif active_tab == "Power & Energy":
         st.subheader("Tracking vs. Fixed Performance")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            # Graph 1: Instantaneous Power Comparison
-            fig_pwr = go.Figure()
-            fig_pwr.add_trace(go.Scatter(x=df_track["Time"], y=df_track["Pload"], name="Tracking Output", line=dict(color="#00CC96")))
-            fig_pwr.add_trace(go.Scatter(x=df_fixed["Time"], y=df_fixed["Pload"], name="Fixed Output", line=dict(color="#EF553B", dash='dash')))
-            fig_pwr.update_layout(
-                title="Instantaneous Power Output at Load", 
-                xaxis_title="Time (h)", 
-                yaxis_title="Power (W)",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig_pwr, use_container_width=True)
-
-        with col2:
-            # Graph 2: Cumulative Energy
-            fig_cum = go.Figure()
-            fig_cum.add_trace(go.Scatter(x=df_track["Time"], y=df_track["Energy_Load"], name="Tracking Energy", line=dict(color="#00CC96")))
-            fig_cum.add_trace(go.Scatter(x=df_fixed["Time"], y=df_fixed["Energy_Load"], name="Fixed Energy", line=dict(color="#EF553B")))
-            fig_cum.update_layout(
-                title="Cumulative Energy Harvest", 
-                xaxis_title="Time (h)", 
-                yaxis_title="Energy (Wh)",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig_cum, use_container_width=True)
+        figs = build_or_report(build_power_figures, selected_day)
+        if figs:
+            col1, col2 = st.columns(2)
+            col1.plotly_chart(figs[0], use_container_width=True)
+            col2.plotly_chart(figs[1], use_container_width=True)
 
     # TAB 2: Convertor Losses
-    with tab2:
+    elif active_tab == "Converter Losses":
         st.subheader("Electrical    Losses due to Convertor")
-        col_a, col_b = st.columns(2)
-        
-        with col_a:
-            # Graph 3: Source vs Load (Shows Converter Loss)
-            fig_loss = go.Figure()
-            fig_loss.add_trace(go.Scatter(x=df_track["Time"], y=df_track["Ppv"], name="Panel Power (Input)"))
-            fig_loss.add_trace(go.Scatter(x=df_track["Time"], y=df_track["Pload"], name="Load Power (Output)"))
-            fig_loss.update_layout(title="Power Conversion: Input vs Output", xaxis_title="Time (h)", yaxis_title="Power (W)")
-            st.plotly_chart(fig_loss, use_container_width=True)
-
-        with col_b:
-            # Graph 4: Instantaneous Efficiency
-            # Filter out low power noise (e.g., night time or < 1W) to avoid division by zero spikes
-            mask = df_track["Ppv"] > 1.0
-            df_eff = df_track[mask].copy()
-            df_eff["Efficiency"] = (df_eff["Pload"] / df_eff["Ppv"]) * 100
-            
-            fig_eff = px.line(df_eff, x="Time", y="Efficiency", title="Converter Efficiency (%)")
-            fig_eff.update_yaxes(range=[90, 100]) # Focus on the relevant efficiency range
-            st.plotly_chart(fig_eff, use_container_width=True)
+        figs = build_or_report(build_loss_figures, selected_day)
+        if figs:
+            col_a, col_b = st.columns(2)
+            col_a.plotly_chart(figs[0], use_container_width=True)
+            col_b.plotly_chart(figs[1], use_container_width=True)
 
     # TAB 3: MPPT BEHAVIOR
-    with tab3:
+    elif active_tab == "MPPT Diagnostics":
         st.subheader("MPPT Operating Point Analysis")
-        
-        # Graph 5: IV Curve Scatter
-        # Shows where the MPPT "hunted" for power
-        fig_iv = px.scatter(
-            df_track, 
-            x="Vpv", 
-            y="Ipv", 
-            color="Ppv", 
-            title="MPPT Trajectory at Pannel (VvsI)",
-            labels={"Vpv": "Panel Voltage (V)", "Ipv": "Panel Current (A)", "Ppv": "Power (W)"},
-            color_continuous_scale="Viridis"
-        )
-        st.plotly_chart(fig_iv, use_container_width=True)
-
-        fig_v = px.scatter(
-            df_track, 
-            x="Vload", 
-            y="Iload", 
-            color="Pload", 
-            title="MPPT Trajectory at Load (VvsI)",
-            labels={"Vload": "Load Voltage (V)", "Iload": "Load Current (A)", "Pload": "Load Power (W)"},
-            color_continuous_scale="Viridis"
-        )
-        st.plotly_chart(fig_v, use_container_width=True)
-
-else:
-    st.error("Data could not be loaded. Please ensure the 'Data/extracted_csvs' folder exists and contains the CSV files.")
\ No newline at end of file
+        figs = build_or_report(build_mppt_figures, selected_day)
+        if figs:
+            st.plotly_chart(figs[0], use_container_width=True)
+            st.plotly_chart(figs[1], use_container_width=True)
+
+elif not files_found:
+    st.error("Data could not be loaded. Please ensure the 'Data/extracted_csvs' folder exists and contains the CSV files.")